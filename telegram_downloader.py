@@ -8,15 +8,63 @@ import os
 import sys
 from datetime import datetime, timedelta, timezone
 from telethon import TelegramClient
-from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument
+from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument, DocumentAttributeFilename, DocumentEmpty
 import asyncio
 import argparse
-import re
 import socket
+from functools import lru_cache
 from db_connection import DatabaseConnection
+from mysql.connector import InterfaceError, OperationalError
+
+# tqdm is optional: with it, Phase 2 shows one throttled progress bar instead of per-file lines
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Files smaller than this finish in a chunk or two, so per-file milestone
+# lines would only add noise; they just get the final "Downloaded" line
+PROGRESS_MIN_BYTES = 1024 * 1024
+
+# Characters that aren't allowed in file names on Windows (plus control characters),
+# mapped to '_' for str.translate()
+UNSAFE_PATH_CHARS = str.maketrans({c: '_' for c in '<>:"/\\|?*' + ''.join(map(chr, range(32)))})
+
+# Chat history is paged through this many message ID ranges at once; more
+# parallel getHistory requests than this tend to trigger FLOOD_WAIT
+SCAN_WORKERS = 4
+
+# Matches waiting for a download worker; when the queue is full the scan pauses,
+# so memory stays bounded no matter how many files the range holds
+DOWNLOAD_QUEUE_SIZE = 64
+
+# Number of scanned messages written to the database per executemany() batch
+DB_BATCH_SIZE = 500
+
+# Download results are written in batches of up to this many, or after this many seconds
+STATUS_BATCH_SIZE = 100
+STATUS_BATCH_WAIT = 1.0
+
+# Documents above this size are streamed with iter_download() in the largest
+# request Telegram allows (download_media() uses 128 KB parts up to 100 MB)
+LARGE_FILE_THRESHOLD = 10 * 1024 * 1024
+LARGE_FILE_REQUEST_SIZE = 512 * 1024
+
+# Large documents are fetched as this many byte ranges in parallel; at most
+# PART_CONCURRENCY part streams run at once across all files
+PARALLEL_PARTS = 4
+PART_CONCURRENCY = 4
+
+# Buffer size for download targets, so small parts don't become one write() each
+WRITE_BUFFER_SIZE = 512 * 1024
+
+# Chunks a large-file part may hold in memory while its disk writes catch up
+# (4 x LARGE_FILE_REQUEST_SIZE = 2 MB per part)
+WRITE_QUEUE_CHUNKS = 4
 
 class TelegramPhotoDownloader:
-    def __init__(self, api_id, api_hash, phone_number, db_connection=None):
+    def __init__(self, api_id, api_hash, phone_number, db_connection=None,
+                 connection_retries=5, auto_reconnect=True, retry_delay=1):
         """
         Initialize the Telegram client.
 
@@ -25,116 +73,474 @@ class TelegramPhotoDownloader:
             api_hash: Your Telegram API Hash
             phone_number: Your phone number for authentication
             db_connection: Database connection instance (optional)
+            connection_retries: How many times to retry connecting before giving up (default: 5)
+            auto_reconnect: Reconnect automatically if the connection drops (default: True)
+            retry_delay: Seconds to wait between connection retries (default: 1)
         """
         self.api_id = api_id
         self.api_hash = api_hash
         self.phone_number = phone_number
         self.hostname = socket.gethostname()
         self.db = db_connection
+        self._pending_rows = []
+        self._status_queue = None
+        self._part_semaphore = None
 
         # Use flood_sleep_threshold to handle rate limiting
         self.client = TelegramClient(
             'session_' + phone_number,
             api_id,
             api_hash,
-            flood_sleep_threshold=60  # Wait up to 60 seconds if rate limited
+            flood_sleep_threshold=60,  # Wait up to 60 seconds if rate limited
+            connection_retries=connection_retries,
+            auto_reconnect=auto_reconnect,
+            retry_delay=retry_delay
         )
 
-    def save_message_to_db(self, message, chat_id, chat_name, media_type, media_filename=None, media_size=None, media_mime=None):
-        """Save retrieved message to database"""
+    def queue_message_for_db(self, message, chat_id, chat_name, media_type, media_filename=None, media_size=None, media_mime=None):
+        """Queue a retrieved message for the next batched insert (flushed every DB_BATCH_SIZE rows)"""
         if not self.db:
             return
 
+        # Get sender information
+        sender_id = message.sender_id if hasattr(message, 'sender_id') else None
+        sender_name = None
+        if hasattr(message, 'sender') and message.sender:
+            sender_name = getattr(message.sender, 'first_name', None) or getattr(message.sender, 'title', None)
+
+        self._pending_rows.append((
+            message.id,
+            chat_id,
+            chat_name,
+            sender_id,
+            sender_name,
+            message.date,
+            message.text if hasattr(message, 'text') else None,
+            media_type,
+            media_filename,
+            media_size,
+            media_mime,
+            True if media_type != 'none' else False,
+            'retrieved'
+        ))
+
+        if len(self._pending_rows) >= DB_BATCH_SIZE:
+            self.flush_pending_rows()
+
+    def flush_pending_rows(self):
+        """Insert all queued messages with a single executemany()"""
+        if not self.db or not self._pending_rows:
+            return
+
+        rows = self._pending_rows
+        self._pending_rows = []
+
+        # One timestamp for the whole batch
+        now = datetime.now()
+        hostname = self.hostname
+        rows = [row + (now, hostname) for row in rows]
+
+        sql = """
+        INSERT INTO messages (
+            message_id, chat_id, chat_name, sender_id, sender_name,
+            message_date, message_text, media_type, media_file_name,
+            media_file_size, media_mime_type, has_media, status,
+            retrieved_datetime, retrieved_hostname
+        ) VALUES (
+            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+        )
+        ON DUPLICATE KEY UPDATE
+            retrieved_datetime = VALUES(retrieved_datetime),
+            retrieved_hostname = VALUES(retrieved_hostname)
+        """
+
         try:
             with self.db.get_cursor() as cursor:
-                # Get sender information
-                sender_id = message.sender_id if hasattr(message, 'sender_id') else None
-                sender_name = None
-                if hasattr(message, 'sender') and message.sender:
-                    sender_name = getattr(message.sender, 'first_name', None) or getattr(message.sender, 'title', None)
-
-                sql = """
-                INSERT INTO messages (
-                    message_id, chat_id, chat_name, sender_id, sender_name,
-                    message_date, message_text, media_type, media_file_name,
-                    media_file_size, media_mime_type, has_media, status,
-                    retrieved_datetime, retrieved_hostname
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                ON DUPLICATE KEY UPDATE
-                    retrieved_datetime = VALUES(retrieved_datetime),
-                    retrieved_hostname = VALUES(retrieved_hostname)
-                """
+                cursor.executemany(sql, rows)
+            return
+        except (InterfaceError, OperationalError) as e:
+            # The database itself is unreachable; retrying row by row won't help
+            print(f"  Warning: Could not save {len(rows)} message(s) to database: {e}")
+            return
+        except Exception:
+            pass
 
-                cursor.execute(sql, (
-                    message.id,
-                    chat_id,
-                    chat_name,
-                    sender_id,
-                    sender_name,
-                    message.date,
-                    message.text if hasattr(message, 'text') else None,
-                    media_type,
-                    media_filename,
-                    media_size,
-                    media_mime,
-                    True if media_type != 'none' else False,
-                    'retrieved',
-                    datetime.now(),
-                    self.hostname
-                ))
-        except Exception as e:
-            print(f"  Warning: Could not save message {message.id} to database: {e}")
+        # One bad row fails the whole statement, so retry one row at a time and lose only that row
+        failed = 0
+        for row in rows:
+            try:
+                with self.db.get_cursor() as cursor:
+                    cursor.execute(sql, row)
+            except Exception as e:
+                failed += 1
+                print(f"  Warning: Could not save message {row[0]} to database: {e}")
+        if failed:
+            print(f"  Warning: {failed} of {len(rows)} message(s) could not be saved to database")
 
     def update_download_status(self, message_id, chat_id, status, filepath=None, file_size=None, error_msg=None):
-        """Update message download status in database"""
+        """Record a finished download; batched by the status writer while download_media() runs"""
         if not self.db:
             return
 
+        entry = (message_id, chat_id, status, filepath, file_size, error_msg)
+        if self._status_queue is not None:
+            self._status_queue.put_nowait(entry)
+        else:
+            self.write_status_batch([entry])
+
+    def write_status_batch(self, entries):
+        """Write queued download results: one multi-row UPDATE per chat plus one executemany() log insert"""
+        if not self.db or not entries:
+            return
+
+        # download_log references messages, so the message rows have to exist first
+        self.flush_pending_rows()
+
+        # One timestamp for the whole batch
+        now = datetime.now()
+
         try:
             with self.db.get_cursor() as cursor:
-                # Update message status
-                sql = """
-                UPDATE messages
-                SET status = %s,
-                    local_file_path = %s,
-                    download_hostname = %s,
-                    updated_at = %s
-                WHERE message_id = %s AND chat_id = %s
-                """
-
-                cursor.execute(sql, (
-                    status,
-                    filepath,
-                    self.hostname,
-                    datetime.now(),
-                    message_id,
-                    chat_id
-                ))
-
-                # Log download attempt
-                log_sql = """
-                INSERT INTO download_log (
-                    message_id, chat_id, download_datetime, download_status,
-                    file_path, file_size, error_message, hostname
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """
-
-                cursor.execute(log_sql, (
-                    message_id,
-                    chat_id,
-                    datetime.now(),
-                    'success' if status == 'downloaded' else 'failed',
-                    filepath,
-                    file_size,
-                    error_msg,
-                    self.hostname
-                ))
+                self._write_status_entries(cursor, entries, now)
+            return
+        except (InterfaceError, OperationalError) as e:
+            # The database itself is unreachable; retrying entry by entry won't help
+            print(f"  Warning: Could not update download status for {len(entries)} file(s) in database: {e}")
+            return
+        except Exception:
+            pass
+
+        # One bad entry (e.g. a message row that was never saved, failing the download_log
+        # foreign key) rolls back the whole batch, so retry one entry at a time
+        failed = 0
+        for entry in entries:
+            try:
+                with self.db.get_cursor() as cursor:
+                    self._write_status_entries(cursor, [entry], now)
+            except Exception as e:
+                failed += 1
+                print(f"  Warning: Could not update download status for message {entry[0]} in database: {e}")
+        if failed:
+            print(f"  Warning: {failed} of {len(entries)} download status update(s) could not be saved to database")
+
+    def _write_status_entries(self, cursor, entries, now):
+        """Run the status UPDATEs (one per chat) and the download_log insert for entries on cursor"""
+        # Update message status, one statement per chat
+        by_chat = {}
+        for entry in entries:
+            by_chat.setdefault(entry[1], []).append(entry)
+
+        for chat_id, chat_entries in by_chat.items():
+            case = ' '.join(['WHEN %s THEN %s'] * len(chat_entries))
+            sql = f"""
+            UPDATE messages
+            SET status = CASE message_id {case} END,
+                local_file_path = CASE message_id {case} END,
+                download_hostname = %s,
+                updated_at = %s
+            WHERE chat_id = %s AND message_id IN ({', '.join(['%s'] * len(chat_entries))})
+            """
+
+            params = []
+            for column in (2, 3):  # status, filepath
+                for entry in chat_entries:
+                    params += (entry[0], entry[column])
+            params.append(self.hostname)
+            params.append(now)
+            params.append(chat_id)
+            params += [entry[0] for entry in chat_entries]
+
+            cursor.execute(sql, params)
+
+        # Log download attempts
+        log_sql = """
+        INSERT INTO download_log (
+            message_id, chat_id, download_datetime, download_status,
+            file_path, file_size, error_message, hostname
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+
+        cursor.executemany(log_sql, [(
+            message_id,
+            chat_id,
+            now,
+            'success' if status == 'downloaded' else 'failed',
+            filepath,
+            file_size,
+            error_msg,
+            self.hostname
+        ) for message_id, chat_id, status, filepath, file_size, error_msg in entries])
+
+    def _downloaded_message_ids(self, chat_id, start_date=None, end_date=None):
+        """
+        Look up which messages in a chat are already recorded as downloaded.
+
+        Args:
+            chat_id: Chat ID as given to download_media() (the value stored in messages.chat_id)
+            start_date, end_date: Optional UTC bounds on message_date
+
+        Returns:
+            Set of message IDs (empty without a database or if the lookup fails)
+        """
+        if not self.db:
+            return set()
+
+        sql = "SELECT message_id FROM messages WHERE chat_id = %s AND status = 'downloaded'"
+        params = [chat_id]
+        if start_date:
+            sql += " AND message_date >= %s"
+            params.append(start_date)
+        if end_date:
+            sql += " AND message_date <= %s"
+            params.append(end_date)
+
+        try:
+            with self.db.get_cursor() as cursor:
+                cursor.execute(sql, params)
+                return {row['message_id'] for row in cursor.fetchall()}
         except Exception as e:
-            print(f"  Warning: Could not update download status in database: {e}")
+            print(f"  Warning: Could not read download history from database: {e}")
+            return set()
+
+    async def _status_writer(self, queue):
+        """Drain queued download results in batches of up to STATUS_BATCH_SIZE or STATUS_BATCH_WAIT seconds"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            entry = await queue.get()
+            if entry is None:
+                break
+
+            batch = [entry]
+            deadline = loop.time() + STATUS_BATCH_WAIT
+            while len(batch) < STATUS_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self.write_status_batch(batch)
+
+    def _start_status_writer(self):
+        """Start batching update_download_status() calls; returns the writer task (None without a database)"""
+        if not self.db:
+            return None
+        self._status_queue = asyncio.Queue()
+        return asyncio.create_task(self._status_writer(self._status_queue))
+
+    async def _stop_status_writer(self, writer):
+        """Flush whatever the status writer still holds and wait for it to finish"""
+        if writer is None:
+            return
+        queue = self._status_queue
+        self._status_queue = None
+        queue.put_nowait(None)
+        await writer
+
+    def _classify(self, message, want_photo, want_video, want_document, file_extensions):
+        """
+        Decide whether a message holds media we want to download.
+
+        Args:
+            message: Telethon message to inspect
+            want_photo, want_video, want_document: Which media types are being collected
+            file_extensions: frozenset of lowercase extensions to keep, or None for all documents
+
+        Returns:
+            Tuple of (media_type, filename, media_size, media_mime), or None if the message doesn't match
+        """
+        media = message.media
+        if not media:
+            return None
+
+        # TL types are never subclassed, so an exact type check is enough
+        media_cls = type(media)
+
+        # Check for photos
+        if want_photo and media_cls is MessageMediaPhoto:
+            timestamp = format_filename_timestamp(message.date)
+            return 'photo', f"{timestamp}_msg{message.id}.jpg", None, 'image/jpeg'
+
+        # Check for videos and documents
+        if media_cls is not MessageMediaDocument:
+            return None
+
+        doc = media.document
+        # Expired self-destructing media has no document, and DocumentEmpty has no attributes or size
+        if doc is None or type(doc) is DocumentEmpty:
+            return None
+        mime_type = getattr(doc, 'mime_type', '') or ''
+
+        # Get original filename from document attributes
+        original_filename = next(
+            (attr.file_name for attr in doc.attributes if isinstance(attr, DocumentAttributeFilename)),
+            None
+        )
+        if original_filename:
+            # Sender-supplied, so a path separator in it mustn't be able to leave chat_dir
+            original_filename = original_filename.translate(UNSAFE_PATH_CHARS)
+
+        # Check for videos
+        if want_video and mime_type.startswith('video/'):
+            timestamp = format_filename_timestamp(message.date)
+            if original_filename:
+                base_name, dot_ext = os.path.splitext(original_filename)
+                filename = f"{timestamp}_{base_name}.{dot_ext.lstrip('.')}"
+            else:
+                filename = f"{timestamp}_msg{message.id}.{video_extension(mime_type)}"
+            return 'video', filename, doc.size, mime_type
 
-    async def download_media(self, chat_id, start_date=None, end_date=None, output_dir='downloads', media_types=['photo'], file_extensions=None, show_count=False):
+        # Check for documents
+        if want_document and original_filename:
+            # Get file extension
+            file_ext = os.path.splitext(original_filename)[1].lstrip('.').lower()
+
+            # Filter by extension if specified
+            if file_extensions and file_ext not in file_extensions:
+                return None
+
+            timestamp = format_filename_timestamp(message.date)
+            return 'document', f"{timestamp}_{original_filename}", doc.size, mime_type
+
+        return None
+
+    async def _stream_download(self, media, filepath, file_size, progress_callback=None):
+        """
+        Download a large document as PARALLEL_PARTS byte ranges fetched concurrently.
+
+        Each range is its own iter_download() in LARGE_FILE_REQUEST_SIZE requests, written
+        through a separate handle into the preallocated file. self._part_semaphore caps how
+        many part streams run at once across all files, to stay clear of FLOOD_WAIT.
+        """
+        received = 0
+
+        # Preallocate so every part can write at its own offset
+        with open(filepath, 'wb') as f:
+            f.truncate(file_size)
+
+        chunk_count = -(-file_size // LARGE_FILE_REQUEST_SIZE)
+        chunks_per_part = -(-chunk_count // PARALLEL_PARTS)
+
+        async def download_part(first_chunk):
+            nonlocal received
+            offset = first_chunk * LARGE_FILE_REQUEST_SIZE
+            async with self._part_semaphore:
+                with open(filepath, 'r+b', buffering=WRITE_BUFFER_SIZE) as f:
+                    f.seek(offset)
+                    # Reads hand chunks to a writer task, so the next request goes out
+                    # while the previous chunk is still being written
+                    chunks = asyncio.Queue(maxsize=WRITE_QUEUE_CHUNKS)
+                    write_failed = asyncio.Event()
+                    writer = asyncio.create_task(self._write_chunks(chunks, f, write_failed))
+                    try:
+                        async for chunk in self.client.iter_download(media, offset=offset, limit=chunks_per_part,
+                                                                     request_size=LARGE_FILE_REQUEST_SIZE, file_size=file_size):
+                            if write_failed.is_set():
+                                break  # e.g. disk full; the writer raises the error below
+                            await chunks.put(chunk)
+                            received += len(chunk)
+                            if progress_callback:
+                                progress_callback(received, file_size)
+                        await chunks.put(None)
+                        await writer
+                    except BaseException:
+                        writer.cancel()
+                        await asyncio.gather(writer, return_exceptions=True)
+                        raise
+
+        parts = [asyncio.create_task(download_part(first_chunk))
+                 for first_chunk in range(0, chunk_count, chunks_per_part)]
+        try:
+            await asyncio.gather(*parts)
+        except BaseException:
+            # Stop the sibling parts before a retry truncates the file under them
+            for part in parts:
+                part.cancel()
+            await asyncio.gather(*parts, return_exceptions=True)
+            raise
+
+        # The file was preallocated, so its size alone doesn't show that every byte arrived
+        if received != file_size:
+            raise IOError(f"Incomplete download: received {received} of {file_size} bytes")
+
+    async def _write_chunks(self, chunks, f, write_failed):
+        """Write queued chunks to f on the default thread pool until a None sentinel arrives
+
+        A failed write sets write_failed so the reader stops fetching, and is raised once
+        the sentinel comes through.
+        """
+        loop = asyncio.get_running_loop()
+        error = None
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            if error is None:
+                try:
+                    await loop.run_in_executor(None, f.write, chunk)
+                except OSError as e:
+                    # Keep draining so the reader never blocks on a full queue
+                    error = e
+                    write_failed.set()
+        if error:
+            raise error
+
+    async def _do_download(self, item, filepath, progress_callback, report, on_retry=None):
+        """
+        Download one queued item to filepath, retrying failed attempts.
+
+        Data goes to filepath + '.part', which is renamed into place only once the download
+        has finished, so an interrupted or failed run never leaves a file under the final
+        name that the next run's existing-file check would take as complete.
+
+        Returns:
+            None on success, or the error message of the final failed attempt
+        """
+        media = item['media']
+        media_size = item['size']
+        label = f"[#{item['index']}] {item['filename']}"
+        part_path = filepath + '.part'
+
+        # Retry logic for failed downloads
+        max_retries = 3
+        for attempt in range(max_retries):
+            if attempt > 0:
+                report(f"  {label}: Retry {attempt}/{max_retries}...")
+                if on_retry:
+                    on_retry()
+                # Wait a bit before retrying
+                await asyncio.sleep(2)
+
+            try:
+                # Download with progress callback
+                if item['type'] != 'photo' and media_size and media_size > LARGE_FILE_THRESHOLD:
+                    await self._stream_download(media, part_path, media_size, progress_callback)
+                else:
+                    # Hand Telethon a file object so its 128 KB parts go through a large buffer
+                    with open(part_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                        await self.client.download_media(media, f, progress_callback=progress_callback)
+                os.replace(part_path, filepath)
+                return None
+            except asyncio.CancelledError:
+                remove_quietly(part_path)
+                raise  # Re-raise to propagate cancellation
+            except Exception as e:
+                if attempt + 1 >= max_retries:
+                    # Final failure after all retries
+                    remove_quietly(part_path)
+                    return str(e)
+                # Will retry
+                report(f"  {label}: Error ({e}), retrying...")
+
+    async def download_media(self, chat_id, start_date=None, end_date=None, output_dir='downloads', media_types=['photo'], file_extensions=None, show_count=False, max_concurrent=5, redownload=False):
         """
         Download photos, videos, and documents from a specific chat within a date range.
 
@@ -145,15 +551,15 @@ class TelegramPhotoDownloader:
             output_dir: Directory to save downloaded media
             media_types: List of media types to download ['photo', 'video', 'document', or combinations]
             file_extensions: List of file extensions to filter (e.g., ['pdf', 'docx']) - only for documents
-            show_count: Whether to count total files before downloading (default: False)
+            show_count: Print running scan totals every 500 messages (default: False; the final total is always shown)
+            max_concurrent: Maximum number of simultaneous downloads (default: 5)
+            redownload: Also fetch messages the database already records as downloaded (default: False)
         """
         await self.client.start(phone=self.phone_number)
         print(f"Connected to Telegram as {self.phone_number}")
 
         # Create output directory if it doesn't exist
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            print(f"Created output directory: {output_dir}")
+        os.makedirs(output_dir, exist_ok=True)
 
         # Get the chat entity
         try:
@@ -179,18 +585,31 @@ class TelegramPhotoDownloader:
             return
 
         # Create a subdirectory for this chat
-        chat_dir = os.path.join(output_dir, f"{chat_name}_{chat_id}".replace('/', '_'))
-        if not os.path.exists(chat_dir):
-            os.makedirs(chat_dir)
-
-        # Normalize file extensions
+        # Sanitize the whole name up front: a bad character only surfacing as an
+        # OSError later would abort the run partway through
+        chat_dir = os.path.join(output_dir, f"{chat_name}_{chat_id}".translate(UNSAFE_PATH_CHARS))
+        os.makedirs(chat_dir, exist_ok=True)
+        # Trailing separator included, so per-file paths are a plain concat
+        chat_dir_prefix = os.path.join(chat_dir, '')
+
+        # Bring the date bounds onto the same UTC tzinfo Telethon uses for message.date,
+        # so the per-message comparisons never need a utcoffset() conversion
+        start_date = to_utc(start_date)
+        end_date = to_utc(end_date)
+
+        # Normalize file extensions (a set keeps the per-message lookup O(1))
         if file_extensions:
-            file_extensions = [ext.lower().lstrip('.') for ext in file_extensions]
+            file_extensions = frozenset(ext.lower().lstrip('.') for ext in file_extensions)
+
+        # Resolve the media type filter once instead of per message
+        want_photo = 'photo' in media_types
+        want_video = 'video' in media_types
+        want_document = 'document' in media_types
 
         # Determine what to search for
         media_type_str = ' and '.join(media_types)
-        if file_extensions and 'document' in media_types:
-            ext_str = ', '.join(file_extensions)
+        if file_extensions and want_document:
+            ext_str = ', '.join(sorted(file_extensions))
             print(f"\nSearching for {media_type_str} (extensions: {ext_str})...")
         else:
             print(f"\nSearching for {media_type_str}...")
@@ -200,283 +619,247 @@ class TelegramPhotoDownloader:
             print(f"End date: {end_date.strftime('%Y-%m-%d %H:%M:%S')}")
         print()
 
-        # Optional first pass: Count total files to download
-        total_files = 0
-        if show_count:
-            print("Counting files to download...")
-            message_count = 0
-            async for message in self.client.iter_messages(chat, reverse=False):
-                message_count += 1
-
-                # Show progress every 100 messages
-                if message_count % 100 == 0:
-                    print(f"Scanned {message_count} messages...")
-
-                # Check date range
-                if start_date and message.date < start_date:
-                    continue
-                if end_date and message.date > end_date:
-                    continue
-
-                # Check if message contains media
-                if not message.media:
-                    continue
+        # Snapshot files left by previous runs so they aren't fetched again
+        existing_files = {}
+        with os.scandir(chat_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    existing_files[entry.name] = entry.stat().st_size
 
-                # Check for photos
-                if 'photo' in media_types and isinstance(message.media, MessageMediaPhoto):
-                    total_files += 1
+        # Messages recorded as downloaded by earlier runs (on this or another machine)
+        recorded_ids = set() if redownload else self._downloaded_message_ids(chat_id, start_date, end_date)
 
-                # Check for videos and documents
-                elif isinstance(message.media, MessageMediaDocument):
-                    doc = message.media.document
-                    mime_type = doc.mime_type if hasattr(doc, 'mime_type') else ''
-
-                    # Get original filename from document attributes
-                    original_filename = None
-                    for attr in doc.attributes:
-                        if hasattr(attr, 'file_name'):
-                            original_filename = attr.file_name
-                            break
+        # Phase 1 (scan) and Phase 2 (download) overlap: the scanner feeds a bounded
+        # queue that max_concurrent workers drain, so downloads start with the first
+        # match and a slow download side holds the scanner back instead of piling up
+        print(f"Scanning messages and downloading matches ({max_concurrent} concurrent)...")
+        if show_count:
+            print("Running totals are shown every 500 messages; the final count follows the scan.\n")
+        else:
+            print("The total file count is reported when the scan completes.\n")
+        work_queue = asyncio.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+        message_scan_count = 0
+        existing_count = 0
+        recorded_count = 0
+        total_files = 0
+        type_counts = {'photo': 0, 'video': 0, 'document': 0}
+        skipped_count = 0
+        downloaded_count = 0
 
-                    # Check for videos
-                    if 'video' in media_types and mime_type.startswith('video/'):
-                        total_files += 1
+        # With tqdm, messages go through pbar.write() so they don't break the bar
+        pbar = tqdm(total=0, unit='file') if tqdm else None
+        report = pbar.write if pbar else print
 
-                    # Check for documents
-                    elif 'document' in media_types and original_filename:
-                        # Get file extension
-                        file_ext = os.path.splitext(original_filename)[1].lstrip('.').lower()
+        # Let the server skip everything newer than end_date. offset_date is
+        # exclusive, so nudge it forward a second to keep end_date inclusive.
+        iter_kwargs = {}
+        if end_date:
+            iter_kwargs['offset_date'] = end_date + timedelta(seconds=1)
 
-                        # Filter by extension if specified
-                        if file_extensions and file_ext not in file_extensions:
-                            continue
+        async def scan_range(low_id, high_id):
+            nonlocal message_scan_count, existing_count, recorded_count, total_files
 
-                        total_files += 1
+            # Bind the per-message calls to locals once for the hot loop
+            classify = self._classify
+            queue_for_db = self.queue_message_for_db
+            existing_size_of = existing_files.get
+            enqueue = work_queue.put
 
-            print(f"Found {total_files} file(s) to download.\n")
+            # Messages arrive newest first, so the scan can stop at start_date.
+            # offset_id and min_id are exclusive bounds.
+            async for message in self.client.iter_messages(chat, offset_id=high_id + 1, min_id=low_id - 1):
+                message_scan_count += 1
 
-            if total_files == 0:
-                print("No files found matching your criteria.")
-                return
+                # Show progress every 500 messages
+                if show_count and message_scan_count % 500 == 0:
+                    report(f"Scanned {message_scan_count} messages, found {total_files} files...")
 
-        # Phase 1: Collect all matching messages
-        print("Collecting messages with media...\n")
-        messages_to_download = []
-        message_scan_count = 0
+                # Check date range
+                if start_date and message.date < start_date:
+                    break
+                if end_date and message.date > end_date:
+                    continue
 
-        async for message in self.client.iter_messages(chat, reverse=False):
-            message_scan_count += 1
+                # Skip messages an earlier run already downloaded
+                if message.id in recorded_ids:
+                    recorded_count += 1
+                    continue
 
-            # Show progress every 500 messages
-            if message_scan_count % 500 == 0:
-                print(f"Scanned {message_scan_count} messages, found {len(messages_to_download)} files...")
+                info = classify(message, want_photo, want_video, want_document, file_extensions)
+                if info is None:
+                    continue
 
-            # Check date range
-            if start_date and message.date < start_date:
-                continue
-            if end_date and message.date > end_date:
-                continue
+                file_type, filename, media_size, media_mime = info
+                # Save to database
+                queue_for_db(message, chat_id, chat_name, file_type, filename, media_size, media_mime)
 
-            # Check if message contains media
-            if not message.media:
-                continue
+                # Skip files already on disk (a size mismatch means an interrupted download)
+                existing_size = existing_size_of(filename)
+                if existing_size and (media_size is None or existing_size == media_size):
+                    existing_count += 1
+                    continue
 
-            # Check for photos
-            if 'photo' in media_types and isinstance(message.media, MessageMediaPhoto):
-                timestamp = message.date.strftime('%Y%m%d_%H%M%S')
-                filename = f"{timestamp}_msg{message.id}.jpg"
-                messages_to_download.append({
-                    'message': message,
+                total_files += 1
+                if pbar:
+                    pbar.total = total_files
+                await enqueue({
+                    # Only what the download needs, so the Message (sender, text, raw TL) can be freed
+                    'id': message.id,
+                    'media': message.media,
                     'filename': filename,
-                    'type': 'photo'
+                    'type': file_type,
+                    'size': media_size,
+                    'index': total_files
                 })
-                # Save to database
-                self.save_message_to_db(message, chat_id, chat_name, 'photo', filename, None, 'image/jpeg')
-
-            # Check for videos and documents
-            elif isinstance(message.media, MessageMediaDocument):
-                doc = message.media.document
-                mime_type = doc.mime_type if hasattr(doc, 'mime_type') else ''
-
-                # Get original filename from document attributes
-                original_filename = None
-                for attr in doc.attributes:
-                    if hasattr(attr, 'file_name'):
-                        original_filename = attr.file_name
-                        break
-
-                # Check for videos
-                if 'video' in media_types and mime_type.startswith('video/'):
-                    timestamp = message.date.strftime('%Y%m%d_%H%M%S')
-                    if original_filename:
-                        ext = os.path.splitext(original_filename)[1].lstrip('.')
-                        base_name = os.path.splitext(original_filename)[0]
-                        filename = f"{timestamp}_{base_name}.{ext}"
-                    else:
-                        ext = mime_type.split('/')[-1] if '/' in mime_type else 'mp4'
-                        if ext == 'quicktime':
-                            ext = 'mov'
-                        filename = f"{timestamp}_msg{message.id}.{ext}"
-
-                    messages_to_download.append({
-                        'message': message,
-                        'filename': filename,
-                        'type': 'video'
-                    })
-                    # Save to database
-                    self.save_message_to_db(message, chat_id, chat_name, 'video', filename, doc.size, mime_type)
-
-                # Check for documents
-                elif 'document' in media_types and original_filename:
-                    # Get file extension
-                    file_ext = os.path.splitext(original_filename)[1].lstrip('.').lower()
-
-                    # Filter by extension if specified
-                    if file_extensions and file_ext not in file_extensions:
-                        continue
-
-                    timestamp = message.date.strftime('%Y%m%d_%H%M%S')
-                    filename = f"{timestamp}_{original_filename}"
-
-                    messages_to_download.append({
-                        'message': message,
-                        'filename': filename,
-                        'type': 'document'
-                    })
-                    # Save to database
-                    self.save_message_to_db(message, chat_id, chat_name, 'document', filename, doc.size, mime_type)
-
-        total_files = len(messages_to_download)
-        print(f"\nFound {total_files} file(s) to download from {message_scan_count} messages scanned.\n")
 
-        if total_files == 0:
-            print("No files found matching your criteria.")
-            return
+        async def scan_messages():
+            # One request for the newest message in range gives the top message ID
+            newest = await self.client.get_messages(chat, limit=1, **iter_kwargs)
+            if not newest:
+                return
+            top_id = newest[0].id
 
-        # Phase 2: Download all collected files with parallel downloads
-        print("Starting parallel downloads (5 concurrent)...\n")
-        photo_count = 0
-        video_count = 0
-        document_count = 0
-        skipped_count = 0
-        downloaded_count = 0
-        download_lock = asyncio.Lock()
+            # Split IDs 1..top_id into disjoint ranges that page through history in parallel
+            range_count = max(1, min(SCAN_WORKERS, top_id))
+            range_size = -(-top_id // range_count)
+            ranges = [(low_id, min(low_id + range_size - 1, top_id)) for low_id in range(1, top_id + 1, range_size)]
 
-        async def download_file(item, index):
-            nonlocal photo_count, video_count, document_count, skipped_count, downloaded_count
+            # Let every range finish (they all feed work_queue) before reporting a failure
+            results = await asyncio.gather(*(scan_range(low_id, high_id) for low_id, high_id in ranges),
+                                           return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
 
-            message = item['message']
+        async def download_file(item):
+            nonlocal skipped_count, downloaded_count
+
+            message_id = item['id']
             filename = item['filename']
             file_type = item['type']
-            filepath = os.path.join(chat_dir, filename)
+            index = item['index']
+            filepath = chat_dir_prefix + filename
 
-            # Track progress milestones shown
-            shown_milestones = set()
+            # Next progress milestone to show, in quarters: 0%, 25%, 50%, 75%
+            next_quarter = 0
 
-            # Progress callback to show download progress
+            # Progress callback to show download progress; runs once per chunk, so it
+            # only does integer comparisons until a milestone is actually reached
             def progress_callback(current, total):
-                nonlocal shown_milestones
-                percentage = (current / total) * 100 if total > 0 else 0
+                nonlocal next_quarter
+                if pbar or total < PROGRESS_MIN_BYTES or next_quarter > 3:
+                    return
+                if current * 4 < total * next_quarter:
+                    return
+
+                milestone = next_quarter * 25
+                next_quarter += 1
                 mb_total = total / (1024 * 1024)
-                mb_current = current / (1024 * 1024)
-
-                # Show progress at key milestones: 0%, 25%, 50%, 75%
-                milestones = [0, 25, 50, 75]
-
-                for milestone in milestones:
-                    if percentage >= milestone and milestone not in shown_milestones:
-                        shown_milestones.add(milestone)
-                        if milestone == 0:
-                            print(f"⬇ Starting [{index}/{total_files}] {filename}: 0% (0.0/{mb_total:.1f} MB)")
-                        else:
-                            print(f"  [{index}/{total_files}] {filename}: {milestone}% ({mb_current:.1f}/{mb_total:.1f} MB)")
-                        break
-
-            # Retry logic for failed downloads
-            max_retries = 3
-            retry_count = 0
-            download_success = False
-
-            while retry_count < max_retries and not download_success:
+                if milestone == 0:
+                    print(f"⬇ Starting [#{index}] {filename}: 0% (0.0/{mb_total:.1f} MB)")
+                else:
+                    print(f"  [#{index}] {filename}: {milestone}% ({current / (1024 * 1024):.1f}/{mb_total:.1f} MB)")
+
+            def reset_progress():
+                nonlocal next_quarter
+                next_quarter = 0
+
+            error_msg = await self._do_download(item, filepath, progress_callback, report, on_retry=reset_progress)
+
+            if error_msg is None:
+                # Get file size (one stat call)
                 try:
-                    if retry_count > 0:
-                        print(f"  [{index}/{total_files}] {filename}: Retry {retry_count}/{max_retries}...")
-                        # Reset shown milestones for retry
-                        shown_milestones.clear()
-                        # Wait a bit before retrying
-                        await asyncio.sleep(2)
-
-                    # Download with progress callback
-                    await self.client.download_media(
-                        message.media,
-                        filepath,
-                        progress_callback=progress_callback
-                    )
-
-                    download_success = True
-
-                    # Get file size
-                    file_size = os.path.getsize(filepath) if os.path.exists(filepath) else None
-
-                    # Update database
-                    self.update_download_status(message.id, chat_id, 'downloaded', filepath, file_size)
-
-                    # Update counters (thread-safe)
-                    async with download_lock:
-                        downloaded_count += 1
-                        if file_type == 'photo':
-                            photo_count += 1
-                        elif file_type == 'video':
-                            video_count += 1
-                        elif file_type == 'document':
-                            document_count += 1
-
-                    print(f"✓ Downloaded {downloaded_count}/{total_files}: {filename}")
-
-                except asyncio.CancelledError:
-                    raise  # Re-raise to propagate cancellation
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count >= max_retries:
-                        # Final failure after all retries
-                        error_msg = str(e)
-
-                        # Update database with failure
-                        self.update_download_status(message.id, chat_id, 'failed', None, None, error_msg)
-
-                        async with download_lock:
-                            downloaded_count += 1
-                            skipped_count += 1
-                        print(f"✗ Failed {downloaded_count}/{total_files}: {filename} - {e}")
-                    else:
-                        # Will retry
-                        print(f"  [{index}/{total_files}] {filename}: Error ({e}), retrying...")
-
-        # Use semaphore to maintain exactly 5 concurrent downloads
-        max_concurrent = 5
-        semaphore = asyncio.Semaphore(max_concurrent)
-
-        async def download_with_semaphore(item, index):
-            async with semaphore:
-                await download_file(item, index)
-
-        # Start all downloads with semaphore controlling concurrency
+                    file_size = os.stat(filepath).st_size
+                except OSError:
+                    file_size = None
+
+                # Update database
+                self.update_download_status(message_id, chat_id, 'downloaded', filepath, file_size)
+
+                # Update counters (workers share one event loop, so no lock is needed)
+                downloaded_count += 1
+                type_counts[file_type] += 1
+
+                if pbar:
+                    pbar.update(1)
+                    pbar.set_postfix_str(filename[:40])
+                else:
+                    print(f"✓ Downloaded {downloaded_count} (of {total_files} found so far): {filename}")
+            else:
+                # Update database with failure
+                self.update_download_status(message_id, chat_id, 'failed', None, None, error_msg)
+
+                downloaded_count += 1
+                skipped_count += 1
+                report(f"✗ Failed #{index}: {filename} - {error_msg}")
+                if pbar:
+                    pbar.update(1)
+
+        async def download_worker():
+            while True:
+                item = await work_queue.get()
+                if item is None:
+                    break
+                await download_file(item)
+
+        # The worker count is what caps concurrent downloads; the part semaphore is
+        # shared by every large-file download in this run
+        self._part_semaphore = asyncio.Semaphore(PART_CONCURRENCY)
+        status_writer = self._start_status_writer()
+        workers = [asyncio.create_task(download_worker()) for _ in range(max_concurrent)]
         try:
-            tasks = [download_with_semaphore(item, i + 1) for i, item in enumerate(messages_to_download)]
-            await asyncio.gather(*tasks)
+            try:
+                await scan_messages()
+            except Exception as e:
+                # Keep what was already queued; it still gets downloaded below
+                report(f"\n✗ Scan stopped early after {message_scan_count} messages: {e}")
+
+            # Write out the last partial batch of scanned messages
+            self.flush_pending_rows()
+
+            report(f"\nScan complete: found {total_files} file(s) to download from {message_scan_count} messages scanned.")
+            if existing_count:
+                report(f"Skipping {existing_count} file(s) already in {chat_dir}")
+            if recorded_count:
+                report(f"Skipping {recorded_count} message(s) already recorded as downloaded (use --redownload to fetch them again)")
+
+            # One sentinel per worker; each exits once the queue is drained
+            for _ in workers:
+                await work_queue.put(None)
+            await asyncio.gather(*workers)
         except asyncio.CancelledError:
+            for worker in workers:
+                worker.cancel()
+            self.flush_pending_rows()
+            if pbar:
+                pbar.close()
             print(f"\n✗ Download interrupted by user (Ctrl+C)")
-            print(f"Downloaded {downloaded_count}/{total_files} files before interruption")
+            print(f"Downloaded {downloaded_count} of {total_files} files found before interruption")
+            # Keep propagating, so a --batch-file run stops instead of starting the next job
+            raise
+        finally:
+            # Write out the download results still waiting in the status queue
+            await self._stop_status_writer(status_writer)
+
+        if pbar:
+            pbar.close()
+
+        if total_files == 0:
+            if existing_count or recorded_count:
+                print("All matching files have already been downloaded.")
+            else:
+                print("No files found matching your criteria.")
             return
 
         print(f"\n{'='*50}")
         print(f"Download Summary:")
-        if 'photo' in media_types:
-            print(f"Total photos downloaded: {photo_count}")
-        if 'video' in media_types:
-            print(f"Total videos downloaded: {video_count}")
-        if 'document' in media_types:
-            print(f"Total documents downloaded: {document_count}")
+        if want_photo:
+            print(f"Total photos downloaded: {type_counts['photo']}")
+        if want_video:
+            print(f"Total videos downloaded: {type_counts['video']}")
+        if want_document:
+            print(f"Total documents downloaded: {type_counts['document']}")
+        print(f"Already downloaded (skipped): {existing_count + recorded_count}")
         print(f"Failed downloads: {skipped_count}")
         print(f"Saved to: {chat_dir}")
         print(f"{'='*50}")
@@ -488,11 +871,16 @@ class TelegramPhotoDownloader:
         print(f"{'ID':<15} {'Type':<15} {'Name'}")
         print("-" * 60)
 
+        # Collect everything first and write the table in one go
+        lines = []
         async for dialog in self.client.iter_dialogs():
             chat_type = type(dialog.entity).__name__
             chat_name = dialog.name
             chat_id = dialog.id
-            print(f"{chat_id:<15} {chat_type:<15} {chat_name}")
+            lines.append(f"{chat_id:<15} {chat_type:<15} {chat_name}")
+
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
 
     async def disconnect(self):
         """Disconnect the client."""
@@ -503,6 +891,68 @@ class TelegramPhotoDownloader:
             pass
 
 
+def remove_quietly(path):
+    """Delete a file if it exists, ignoring errors (used for leftover .part files)"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=None)
+def video_extension(mime_type):
+    """File extension for a video without a file name, from its MIME type (cached; chats use only a few)"""
+    ext = mime_type.split('/')[-1] if '/' in mime_type else 'mp4'
+    return 'mov' if ext == 'quicktime' else ext
+
+
+def format_filename_timestamp(dt):
+    """Format a datetime as YYYYMMDD_HHMMSS (same as strftime, without the locale-aware C call)"""
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}_{dt.hour:02d}{dt.minute:02d}{dt.second:02d}"
+
+
+def parse_batch_file(path):
+    """
+    Read download jobs from a batch file.
+
+    Each non-empty line is "chat_id[,start_date[,end_date]]"; lines starting with # are comments.
+    Missing end dates default to now, like --end-date.
+
+    Returns:
+        List of (chat_id, start_date, end_date) tuples
+    """
+    jobs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            fields = [field.strip() for field in line.split(',')]
+            if len(fields) > 3 or not fields[0]:
+                raise ValueError(f"{path}:{line_number}: expected chat_id[,start_date[,end_date]], got: {line}")
+            fields += [''] * (3 - len(fields))
+
+            try:
+                start_date = parse_date(fields[1])
+                end_date = parse_date(fields[2]) if fields[2] else datetime.now(timezone.utc)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: {e}")
+
+            jobs.append((fields[0], start_date, end_date))
+
+    return jobs
+
+
+def to_utc(dt):
+    """Return dt as a UTC-aware datetime (naive values are taken to be UTC already)"""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
 def parse_date(date_string):
     """Parse date string in format YYYY-MM-DD or YYYY-MM-DD HH:MM:SS"""
     if not date_string:
@@ -547,6 +997,9 @@ Examples:
   # Download photos, videos, and documents
   python telegram_downloader.py --chat-id -1001234567890 --media-type all
 
+  # Run several chats/date ranges over one connection (lines: chat_id,start_date,end_date)
+  python telegram_downloader.py --batch-file jobs.txt --media-type all
+
 Note: You need to create a Telegram app at https://my.telegram.org to get API_ID and API_HASH
         """
     )
@@ -555,6 +1008,8 @@ Note: You need to create a Telegram app at https://my.telegram.org to get API_ID
     parser.add_argument('--api-hash', help='Telegram API Hash (or set TELEGRAM_API_HASH env var)')
     parser.add_argument('--phone', help='Phone number (or set TELEGRAM_PHONE env var)')
     parser.add_argument('--chat-id', help='Chat/Group ID or username to download from')
+    parser.add_argument('--batch-file',
+                        help='File with one "chat_id,start_date,end_date" job per line, run over a single connection (replaces --chat-id)')
     parser.add_argument('--start-date', help='Start date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)')
     parser.add_argument('--end-date', help='End date (YYYY-MM-DD or YYYY-MM-DD HH:MM:SS)')
     parser.add_argument('--output-dir', default='downloads', help='Output directory (default: downloads)')
@@ -565,7 +1020,11 @@ Note: You need to create a Telegram app at https://my.telegram.org to get API_ID
     parser.add_argument('--extensions',
                         help='File extensions to filter for documents (comma-separated, e.g., pdf,docx,zip). Only applies when media-type is document or all')
     parser.add_argument('--show-count', action='store_true',
-                        help='Count total files before downloading (slower start, shows progress as X/Y)')
+                        help='Show running scan totals while downloading (the final count is always shown after the scan)')
+    parser.add_argument('--concurrency', type=int, default=5,
+                        help='Number of files to download in parallel (default: 5)')
+    parser.add_argument('--redownload', action='store_true',
+                        help='Fetch files again even if the database records them as downloaded')
     parser.add_argument('--list-chats', action='store_true', help='List all available chats and exit')
 
     args = parser.parse_args()
@@ -608,14 +1067,26 @@ Note: You need to create a Telegram app at https://my.telegram.org to get API_ID
         if args.list_chats:
             await downloader.list_chats()
         else:
-            if not args.chat_id:
-                print("Error: --chat-id is required when not using --list-chats")
+            if not args.chat_id and not args.batch_file:
+                print("Error: --chat-id or --batch-file is required when not using --list-chats")
                 print("Run with --list-chats to see available chats")
                 sys.exit(1)
 
-            # Parse dates
-            start_date = parse_date(args.start_date)
-            end_date = parse_date(args.end_date) if args.end_date else datetime.now(timezone.utc)
+            if args.concurrency < 1:
+                print(f"Error: --concurrency must be at least 1, got: {args.concurrency}")
+                sys.exit(1)
+
+            # Build the job list: either the batch file or the single --chat-id
+            if args.batch_file:
+                try:
+                    jobs = parse_batch_file(args.batch_file)
+                except (OSError, ValueError) as e:
+                    print(f"Error reading batch file: {e}")
+                    sys.exit(1)
+            else:
+                start_date = parse_date(args.start_date)
+                end_date = parse_date(args.end_date) if args.end_date else datetime.now(timezone.utc)
+                jobs = [(args.chat_id, start_date, end_date)]
 
             # Determine media types to download
             if args.media_type == 'both':
@@ -630,16 +1101,24 @@ Note: You need to create a Telegram app at https://my.telegram.org to get API_ID
             if args.extensions:
                 file_extensions = [ext.strip() for ext in args.extensions.split(',')]
 
-            # Download media
-            await downloader.download_media(
-                args.chat_id,
-                start_date=start_date,
-                end_date=end_date,
-                output_dir=args.output_dir,
-                media_types=media_types,
-                file_extensions=file_extensions,
-                show_count=args.show_count
-            )
+            # Download media; the client stays connected between jobs
+            for job_number, (chat_id, start_date, end_date) in enumerate(jobs, 1):
+                if len(jobs) > 1:
+                    print(f"\n{'#'*50}")
+                    print(f"Job {job_number}/{len(jobs)}: chat {chat_id}")
+                    print(f"{'#'*50}")
+
+                await downloader.download_media(
+                    chat_id,
+                    start_date=start_date,
+                    end_date=end_date,
+                    output_dir=args.output_dir,
+                    media_types=media_types,
+                    file_extensions=file_extensions,
+                    show_count=args.show_count,
+                    max_concurrent=args.concurrency,
+                    redownload=args.redownload
+                )
     finally:
         await downloader.disconnect()
         if db:
@@ -647,4 +1126,15 @@ Note: You need to create a Telegram app at https://my.telegram.org to get API_ID
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    # uvloop is optional (and unavailable on Windows); without it the default loop is used.
+    # uvloop.run() (0.18+) avoids the event loop policy API deprecated in Python 3.14
+    try:
+        import uvloop
+        run = getattr(uvloop, 'run', asyncio.run)
+    except ImportError:
+        run = asyncio.run
+    try:
+        run(main())
+    except KeyboardInterrupt:
+        # download_media() has already reported the interruption
+        sys.exit(130)